@@ -0,0 +1,59 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True
+"""
+Cython build of dataset_generator.build_page_views_py (same inputs/outputs).
+
+Reads the synth_session_core arrays through typed memoryviews, so the
+per-page-view loop indexes C ints instead of boxed Python ints.
+Build in place with: python setup.py build_ext --inplace
+"""
+
+from libc.stdint cimport int8_t, int64_t
+
+
+def build_page_views(list timestamps,
+                     const int64_t[:] durations,
+                     const int8_t[:] ptypes,
+                     const int64_t[:] pidxs,
+                     const int64_t[:] cidxs,
+                     const int64_t[:] qtys,
+                     list products,
+                     list categories,
+                     list page_types):
+    cdef Py_ssize_t i, n = durations.shape[0]
+    cdef int64_t pidx, cidx, qty
+    cdef list page_views = []
+    cdef set viewed_products = set()
+    cdef dict cart_contents = {}
+    cdef dict chosen, entry
+    cdef object product_id, category_id
+
+    for i in range(n):
+        product_id = None
+        category_id = None
+        pidx = pidxs[i]
+        cidx = cidxs[i]
+
+        if pidx >= 0:
+            chosen = products[pidx]
+            product_id = chosen["product_id"]
+            category_id = chosen["category_id"]
+            viewed_products.add(product_id)
+            qty = qtys[i]
+            if qty:
+                entry = cart_contents.get(product_id)
+                if entry is None:
+                    entry = {"quantity": 0, "price": chosen["base_price"]}
+                    cart_contents[product_id] = entry
+                entry["quantity"] += qty
+        elif cidx >= 0:
+            category_id = categories[cidx]["category_id"]
+
+        page_views.append({
+            "timestamp": timestamps[i],
+            "page_type": page_types[ptypes[i]],
+            "product_id": product_id,
+            "category_id": category_id,
+            "view_duration": durations[i]
+        })
+
+    return page_views, viewed_products, cart_contents
@@ -5,7 +5,8 @@
 Generates:
 - users.json
 - categories.json
-- products.json
+- products.json (stock as generated)
+- products_stock.json ({product_id: [current_stock, is_active]} after purchases)
 - transactions.json
 - sessions_0.json, sessions_1.json, ...
 
@@ -21,32 +22,90 @@ Transactions: transaction_id, session_id (nullable), user_id, timestamp, items[{
 
 Key 8GB design choices:
 - Sessions and transactions are STREAM-WRITTEN (no giant lists in RAM).
-- Sessions are written in CHUNKS into sessions_N.json (JSON arrays).
-- Transactions are streamed into one JSON array file (transactions.json) safely.
+- All files are JSON Lines (one object per line); --legacy-json writes JSON arrays instead.
+- Sessions are written in CHUNKS into sessions_N.json, spread over --workers processes.
+  Each chunk reserves stock against its own copy of the starting inventory (no global
+  stock consistency across chunks); the summed reservations are applied at the end.
+- Transactions are streamed into one file (transactions.json) safely.
 - Products/users/categories are kept in memory (small enough at 8GB-safe defaults).
+- Faker is pinned to the en_US locale, so all generated text is ASCII.
 """
 
 import argparse
-import json
+import calendar
+import math
+import itertools
 import os
 import random
+import socket
 import string
+import struct
+import time
 import datetime as dt
+from concurrent.futures import ProcessPoolExecutor
 from typing import Dict, List, Optional, Tuple
 
+import numpy as np
+import orjson
 from faker import Faker
+from numba import njit
 
 
 # ----------------------------
 # Helpers
 # ----------------------------
-def iso(ts: dt.datetime) -> str:
-    # Ensure naive ISO format like the PDF samples
-    return ts.replace(microsecond=0).isoformat()
+def wall_clock_now() -> int:
+    # Local wall-clock time as naive epoch seconds (datetime.now() without tz math)
+    return calendar.timegm(dt.datetime.now().timetuple())
+
+
+# Date prefix ("YYYY-MM-DDT") per day number, filled lazily by iso_epoch()
+_DAY_PREFIX: Dict[int, str] = {}
+
+
+def iso_epoch(t: int) -> str:
+    """
+    Naive ISO format like the PDF samples, from naive epoch seconds.
+    Only the date part goes through strftime (cached per day); the time of
+    day is plain integer math, so no datetime object is built per call.
+    """
+    day, sod = divmod(t, 86400)
+    prefix = _DAY_PREFIX.get(day)
+    if prefix is None:
+        prefix = _DAY_PREFIX[day] = time.strftime("%Y-%m-%dT", time.gmtime(day * 86400))
+    h, rem = divmod(sod, 3600)
+    m, s = divmod(rem, 60)
+    return "%s%02d:%02d:%02d" % (prefix, h, m, s)
 
 
 def rand_hex(n: int) -> str:
-    return "".join(random.choice("0123456789abcdef") for _ in range(n))
+    # One getrandbits() call, zero-padded to n hex digits (seeded like the rest)
+    return f"{random.getrandbits(n * 4):0{n}x}"
+
+
+def rand_ipv4_public() -> str:
+    # Random 32-bit address, redrawn while it falls in a private/reserved block
+    while True:
+        n = random.getrandbits(32)
+        first = n >> 24
+        if first in (0, 10, 127) or first >= 224:
+            continue
+        if (n >> 20) == 0xAC1 or (n >> 16) in (0xC0A8, 0xA9FE) or (n >> 22) == 0x191:
+            continue  # 172.16/12, 192.168/16, 169.254/16, 100.64/10
+        return socket.inet_ntoa(struct.pack(">I", n))
+
+
+# Serialized bytes are accumulated up to this size before one os.write()
+WRITE_BUFFER_BYTES = 1 << 20
+
+
+def flush_buffer(fd: int, buf: bytearray) -> None:
+    """Write the whole buffer to a raw fd (os.write may be partial) and clear it."""
+    with memoryview(buf) as mv:
+        written = 0
+        while written < len(mv):
+            written += os.write(fd, mv[written:])
+    buf.clear()
 
 
 def write_json_array(path: str, items_iter, progress_every: int = 0, label: str = "") -> int:
@@ -56,29 +115,53 @@ def write_json_array(path: str, items_iter, progress_every: int = 0, label: str
     """
     count = 0
     os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
-        f.write("[\n")
+    # Unbuffered file: we do our own ~1 MB batching in a bytearray
+    with open(path, "wb", buffering=0) as f:
+        fd = f.fileno()
+        buf = bytearray(b"[\n")
         first = True
         for item in items_iter:
             if not first:
-                f.write(",\n")
+                buf += b",\n"
             first = False
-            f.write(json.dumps(item, ensure_ascii=False))
+            # orjson emits UTF-8 bytes directly (same output as ensure_ascii=False)
+            buf += orjson.dumps(item)
+            if len(buf) >= WRITE_BUFFER_BYTES:
+                flush_buffer(fd, buf)
+            count += 1
+            if progress_every and count % progress_every == 0:
+                print(f"[{label}] wrote {count:,} records -> {path}")
+        buf += b"\n]\n"
+        flush_buffer(fd, buf)
+    return count
+
+
+def write_json_lines(path: str, items_iter, progress_every: int = 0, label: str = "") -> int:
+    """
+    Stream-write one JSON object per line (NDJSON). No brackets or separators,
+    so there is no per-record branch and a partial file is still valid.
+    Returns count written.
+    """
+    count = 0
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "wb", buffering=0) as f:
+        fd = f.fileno()
+        buf = bytearray()
+        for item in items_iter:
+            buf += orjson.dumps(item, option=orjson.OPT_APPEND_NEWLINE)
+            if len(buf) >= WRITE_BUFFER_BYTES:
+                flush_buffer(fd, buf)
             count += 1
             if progress_every and count % progress_every == 0:
                 print(f"[{label}] wrote {count:,} records -> {path}")
-        f.write("\n]\n")
+        flush_buffer(fd, buf)
     return count
 
 
-def weighted_choice(choices: List[Tuple[str, float]]) -> str:
-    r = random.random()
-    total = 0.0
-    for v, w in choices:
-        total += w
-        if r <= total:
-            return v
-    return choices[-1][0]
+def zip_to_cum(choices: List[Tuple[str, float]]) -> Tuple[Tuple[str, ...], List[float]]:
+    # Split (value, weight) pairs into values + cumulative weights, once per constant
+    names, weights = zip(*choices)
+    return names, list(itertools.accumulate(weights))
 
 
 # ----------------------------
@@ -88,90 +171,152 @@ class Inventory:
     def __init__(self, products: List[dict]):
         # Keep only what we need
         self.products: Dict[str, dict] = {p["product_id"]: p for p in products}
-
-    def in_stock(self, pid: str, qty: int) -> bool:
-        p = self.products.get(pid)
-        return bool(p) and p["current_stock"] >= qty and p["is_active"] is True
-
-    def reserve(self, pid: str, qty: int) -> bool:
-        if not self.in_stock(pid, qty):
+        # Live stock is held in flat arrays (index = position in `products`);
+        # the product dicts keep the initial snapshot written to products.json
+        self.index: Dict[str, int] = {pid: i for i, pid in enumerate(self.products)}
+        self.stock = np.array([p["current_stock"] for p in products], dtype=np.int64)
+        self.active = np.array([p["is_active"] for p in products], dtype=np.bool_)
+
+    def in_stock(self, i: int, qty: int) -> bool:
+        return self.active[i] and self.stock[i] >= qty
+
+    def reserve(self, i: int, qty: int) -> bool:
+        stock = self.stock
+        if not self.active[i] or stock[i] < qty:
             return False
-        p = self.products[pid]
-        p["current_stock"] -= qty
-        if p["current_stock"] <= 0:
-            p["current_stock"] = 0
-            p["is_active"] = False
+        stock[i] -= qty
+        if stock[i] <= 0:
+            stock[i] = 0
+            self.active[i] = False
         return True
 
+    def apply_consumption(self, consumed: np.ndarray) -> None:
+        """Subtract units reserved elsewhere (e.g. by a session chunk worker)."""
+        np.maximum(self.stock - consumed, 0, out=self.stock)
+        self.active &= self.stock > 0
+
+    def stock_snapshot(self) -> Dict[str, Tuple[int, bool]]:
+        """{product_id: (current_stock, is_active)} from the live arrays."""
+        return dict(zip(self.products, zip(self.stock.tolist(), self.active.tolist())))
+
+
+# ----------------------------
+# Faker value pools
+# ----------------------------
+def build_faker_pools(fake: Faker, pool_size: int, num_categories: int, num_subcats: int,
+                      num_products: int, num_users: int) -> Dict[str, List[str]]:
+    """
+    Pre-generate Faker values once; the generators then sample these lists
+    with random.choice instead of paying a Faker provider call per record.
+    Each pool is capped at the number of draws it will serve, so this never
+    costs more Faker calls than calling Faker directly.
+    """
+    def pool(gen, n: int) -> List[str]:
+        return [gen() for _ in range(max(1, min(pool_size, n)))]
+
+    return {
+        "company": pool(fake.company, num_categories),
+        "bs": pool(fake.bs, num_subcats),
+        "catch_phrase": pool(fake.catch_phrase, num_products),
+        "city": pool(fake.city, num_users),
+        "state": pool(fake.state_abbr, num_users),
+        "country": pool(fake.country_code, num_users),
+    }
+
 
 # ----------------------------
 # Generators for entities
 # ----------------------------
-def gen_categories(fake: Faker, num_categories: int, subcats_per_cat: Tuple[int, int]) -> List[dict]:
+def iso_seconds(base: np.datetime64, offsets: np.ndarray) -> List[str]:
+    # Vectorized iso_epoch(): base + integer second offsets -> naive ISO strings
+    return np.datetime_as_string(base + offsets.astype("timedelta64[s]"), unit="s").tolist()
+
+
+def gen_categories(rng: np.random.Generator, pools: Dict[str, List[str]], num_categories: int,
+                   subcats_per_cat: Tuple[int, int]) -> List[dict]:
+    n_subs = rng.integers(subcats_per_cat[0], subcats_per_cat[1] + 1, num_categories).tolist()
+    total_subs = sum(n_subs)
+    cat_names = rng.integers(0, len(pools["company"]), num_categories).tolist()
+    sub_names = rng.integers(0, len(pools["bs"]), total_subs).tolist()
+    margins = rng.uniform(0.10, 0.40, total_subs).round(2).tolist()
+
     categories = []
+    k = 0
     for cat_id in range(num_categories):
         cat = {
             "category_id": f"cat_{cat_id:03d}",
-            "name": fake.company(),
+            "name": pools["company"][cat_names[cat_id]],
             "subcategories": []
         }
-        n_sub = random.randint(subcats_per_cat[0], subcats_per_cat[1])
-        for sub_id in range(n_sub):
+        for sub_id in range(n_subs[cat_id]):
             cat["subcategories"].append({
                 "subcategory_id": f"sub_{cat_id:03d}_{sub_id:02d}",
-                "name": fake.bs().title(),
-                "profit_margin": round(random.uniform(0.10, 0.40), 2)
+                "name": pools["bs"][sub_names[k]].title(),
+                "profit_margin": margins[k]
             })
+            k += 1
         categories.append(cat)
     return categories
 
 
-def gen_products(fake: Faker, categories: List[dict], num_products: int, timespan_days: int) -> List[dict]:
+def gen_products(rng: np.random.Generator, pools: Dict[str, List[str]], categories: List[dict],
+                 num_products: int, timespan_days: int) -> List[dict]:
+    n = num_products
+    day = 86400
+    now = dt.datetime.now().replace(microsecond=0)
+    creation_start = now - dt.timedelta(days=timespan_days * 2)
+    base = np.datetime64(creation_start, "s")
+    end_off = timespan_days * 2 * day
+
+    # One batched draw per field instead of ~10 random.* calls per product
+    cat_idx = rng.integers(0, len(categories), n)
+    sub_u = rng.random(n)
+    name_idx = rng.integers(0, len(pools["catch_phrase"]), n)
+
+    # 1st price, then 0-2 additional changes (each between the previous date and now)
+    prices = np.empty((n, 3))
+    prices[:, 0] = rng.uniform(5, 500, n).round(2)
+    factors = rng.uniform(0.8, 1.2, (n, 2))
+    for j in (1, 2):
+        prices[:, j] = (prices[:, j - 1] * factors[:, j - 1]).round(2)
+    offsets = np.empty((n, 3), dtype=np.int64)
+    offsets[:, 0] = rng.integers(0, max(1, timespan_days // 3) * day + 1, n)
+    fracs = rng.random((n, 2))
+    for j in (1, 2):
+        offsets[:, j] = offsets[:, j - 1] + (fracs[:, j - 1] * (end_off - offsets[:, j - 1])).astype(np.int64)
+    n_changes = rng.integers(0, 3, n)
+
+    # Keep some out-of-stock + inactive products to match PDF sample
+    stock = rng.integers(10, 1001, n)
+    is_active = rng.random(n) < 0.95
+    stock[~is_active & (rng.random(n) < 0.7)] = 0
+    is_active &= stock > 0
+
+    dates = np.array(iso_seconds(base, offsets.ravel()), dtype=object).reshape(n, 3).tolist()
+    prices = prices.tolist()
+    n_changes = n_changes.tolist()
+    stock = stock.tolist()
+    is_active = is_active.tolist()
+    cat_idx = cat_idx.tolist()
+    sub_u = sub_u.tolist()
+    name_idx = name_idx.tolist()
+
     products = []
-    creation_start = dt.datetime.now() - dt.timedelta(days=timespan_days * 2)
-
-    for prod_id in range(num_products):
-        cat = random.choice(categories)
-        sub = random.choice(cat["subcategories"])
-
-        base_price0 = round(random.uniform(5, 500), 2)
-        price_history = []
-
-        # 1st price
-        initial_date = fake.date_time_between(
-            start_date=creation_start,
-            end_date=creation_start + dt.timedelta(days=max(1, timespan_days // 3))
-        )
-        price_history.append({"price": base_price0, "date": iso(initial_date)})
-
-        # 0-2 additional changes
-        n_changes = random.randint(0, 2)
-        last_price = base_price0
-        last_date = initial_date
-        for _ in range(n_changes):
-            change_date = fake.date_time_between(start_date=last_date, end_date="now")
-            new_price = round(last_price * random.uniform(0.8, 1.2), 2)
-            price_history.append({"price": new_price, "date": iso(change_date)})
-            last_price = new_price
-            last_date = change_date
-
-        price_history.sort(key=lambda x: x["date"])
-        current_price = price_history[-1]["price"]
-
-        # Keep some out-of-stock + inactive products to match PDF sample
-        stock = random.randint(10, 1000)
-        is_active = random.choices([True, False], weights=[0.95, 0.05])[0]
-        if not is_active and random.random() < 0.7:
-            stock = 0
+    for prod_id in range(n):
+        cat = categories[cat_idx[prod_id]]
+        subs = cat["subcategories"]
+        sub = subs[int(sub_u[prod_id] * len(subs))]
+        k = n_changes[prod_id] + 1
+        price_history = [{"price": prices[prod_id][j], "date": dates[prod_id][j]} for j in range(k)]
 
         products.append({
             "product_id": f"prod_{prod_id:05d}",
-            "name": fake.catch_phrase().title(),
+            "name": pools["catch_phrase"][name_idx[prod_id]].title(),
             "category_id": cat["category_id"],
             "subcategory_id": sub["subcategory_id"],
-            "base_price": current_price,
-            "current_stock": stock,
-            "is_active": bool(is_active and stock > 0),
+            "base_price": price_history[-1]["price"],
+            "current_stock": stock[prod_id],
+            "is_active": is_active[prod_id],
             "price_history": price_history,
             "creation_date": price_history[0]["date"]
         })
@@ -179,30 +324,51 @@ def gen_products(fake: Faker, categories: List[dict], num_products: int, timespa
     return products
 
 
-def gen_users(fake: Faker, num_users: int, timespan_days: int) -> List[dict]:
-    users = []
-    for user_id in range(num_users):
-        reg_date = fake.date_time_between(
-            start_date=f"-{timespan_days * 3}d",
-            end_date=f"-{timespan_days}d"
-        )
-        users.append({
+def gen_users(rng: np.random.Generator, pools: Dict[str, List[str]], num_users: int, timespan_days: int) -> List[dict]:
+    n = num_users
+    day = 86400
+    now = dt.datetime.now().replace(microsecond=0)
+    base = np.datetime64(now - dt.timedelta(days=timespan_days * 3), "s")
+    end_off = timespan_days * 3 * day
+
+    # Registration in [-3*timespan, -timespan] days, last_active in [registration, now]
+    reg_off = rng.integers(0, timespan_days * 2 * day + 1, n)
+    last_off = rng.integers(reg_off, end_off + 1)
+    reg_dates = iso_seconds(base, reg_off)
+    last_dates = iso_seconds(base, last_off)
+    cities = rng.integers(0, len(pools["city"]), n).tolist()
+    states = rng.integers(0, len(pools["state"]), n).tolist()
+    countries = rng.integers(0, len(pools["country"]), n).tolist()
+
+    return [
+        {
             "user_id": f"user_{user_id:06d}",
             "geo_data": {
-                "city": fake.city(),
-                "state": fake.state_abbr(),
-                "country": fake.country_code()
+                "city": pools["city"][cities[user_id]],
+                "state": pools["state"][states[user_id]],
+                "country": pools["country"][countries[user_id]]
             },
-            "registration_date": iso(reg_date),
-            "last_active": iso(fake.date_time_between(start_date=reg_date, end_date="now"))
-        })
-    return users
+            "registration_date": reg_dates[user_id],
+            "last_active": last_dates[user_id]
+        }
+        for user_id in range(n)
+    ]
 
 
 # ----------------------------
 # Session/Transaction synthesis
 # ----------------------------
+# Page type ids used by the njit core are positions in PAGE_TYPES
 PAGE_TYPES = ["home", "search", "category_listing", "product_detail", "cart", "checkout"]
+PT_HOME, PT_SEARCH, PT_CATEGORY, PT_PRODUCT, PT_CART, PT_CHECKOUT = range(len(PAGE_TYPES))
+
+# Next-page mixes: (page type ids, cumulative weights), keyed by the previous page
+MIX_AFTER_CART = (np.array([PT_CHECKOUT, PT_PRODUCT, PT_SEARCH], dtype=np.int8),
+                  np.cumsum([0.35, 0.40, 0.25]))
+MIX_AFTER_CHECKOUT = (np.array([PT_CHECKOUT, PT_CART, PT_PRODUCT], dtype=np.int8),
+                      np.cumsum([0.20, 0.30, 0.50]))
+MIX_DEFAULT = (np.array([PT_SEARCH, PT_CATEGORY, PT_PRODUCT, PT_CART], dtype=np.int8),
+               np.cumsum([0.20, 0.25, 0.40, 0.15]))
 
 DEVICE_TYPES = ["mobile", "desktop", "tablet"]
 OS_TYPES = ["iOS", "Android", "Windows", "macOS", "Linux"]
@@ -214,117 +380,186 @@ REFERRERS = [
     ("social_media", 0.20),
     ("email_campaign", 0.10),
 ]
+REFERRER_NAMES, REFERRER_CUM = zip_to_cum(REFERRERS)
 
 PAYMENT_METHODS = ["credit_card", "paypal", "bank_transfer", "gift_card"]
 TX_STATUSES = ["completed", "processing", "shipped", "delivered"]
 
 
-def make_page_flow(session_duration: int) -> List[int]:
-    # 4–14 page views, with time slots sorted
-    n_views = random.randint(4, 14)
-    points = sorted({0, session_duration} | {random.randint(1, session_duration - 1) for _ in range(n_views - 1)})
-    return points
+@njit(cache=True)
+def _weighted_pick(ids, cum, r):
+    # Binary search on the precomputed cumulative weights
+    return ids[np.searchsorted(cum, r * cum[-1], side="right")]
 
 
-def choose_page_type(i: int, prev: List[dict]) -> str:
-    if i == 0:
-        return "home"
-    if prev and prev[-1]["page_type"] == "cart":
-        return weighted_choice([("checkout", 0.35), ("product_detail", 0.40), ("search", 0.25)])
-    if prev and prev[-1]["page_type"] == "checkout":
-        return weighted_choice([("checkout", 0.20), ("cart", 0.30), ("product_detail", 0.50)])
-    return weighted_choice([
-        ("search", 0.20),
-        ("category_listing", 0.25),
-        ("product_detail", 0.40),
-        ("cart", 0.15),
-    ])
+@njit(cache=True)
+def synth_session_core(rng, duration, stock, active, n_categories):
+    """
+    Numeric core of session_record: page flow, page types, product picks and
+    cart quantity rolls, all on flat arrays. Returns per-page-view arrays
+    (slot offsets, view durations, page type ids, product index or -1,
+    category index or -1, units added to cart).
+    """
+    # 4-14 page views, with time slots sorted
+    n_views = rng.integers(4, 15)
+    points = np.empty(n_views + 1, dtype=np.int64)
+    points[0] = 0
+    points[1] = duration
+    for k in range(n_views - 1):
+        points[k + 2] = rng.integers(1, duration)
+    slots = np.unique(points)
+
+    m = len(slots) - 1
+    page_types = np.empty(m, dtype=np.int8)
+    product_idx = np.full(m, -1, dtype=np.int64)
+    category_idx = np.full(m, -1, dtype=np.int64)
+    cart_qty = np.zeros(m, dtype=np.int64)
+    n_products = len(stock)
+
+    prev = -1
+    for i in range(m):
+        if i == 0:
+            ptype = PT_HOME
+        elif prev == PT_CART:
+            ptype = _weighted_pick(MIX_AFTER_CART[0], MIX_AFTER_CART[1], rng.random())
+        elif prev == PT_CHECKOUT:
+            ptype = _weighted_pick(MIX_AFTER_CHECKOUT[0], MIX_AFTER_CHECKOUT[1], rng.random())
+        else:
+            ptype = _weighted_pick(MIX_DEFAULT[0], MIX_DEFAULT[1], rng.random())
+        page_types[i] = ptype
+        prev = ptype
 
+        if ptype == PT_CATEGORY:
+            category_idx[i] = rng.integers(0, n_categories)
 
-def pick_product_and_category(products: List[dict], categories: List[dict]) -> Tuple[Optional[dict], Optional[dict]]:
-    p = random.choice(products)
-    # Find category quickly by id (build once in caller if you want)
-    cat = None
-    return p, cat
+        elif ptype == PT_PRODUCT:
+            # Prefer active, in-stock products for better conversion realism
+            chosen = -1
+            for _ in range(5):
+                cand = rng.integers(0, n_products)
+                if active[cand] and stock[cand] > 0:
+                    chosen = cand
+                    break
+            if chosen < 0:
+                chosen = rng.integers(0, n_products)
+            product_idx[i] = chosen
+
+            # Add 1-3 units to cart with 30% probability, respecting current stock
+            if rng.random() < 0.30:
+                in_cart = 0
+                for j in range(i):
+                    if product_idx[j] == chosen:
+                        in_cart += cart_qty[j]
+                remaining = stock[chosen] - in_cart
+                if remaining > 0:
+                    cart_qty[i] = rng.integers(1, min(3, remaining) + 1)
 
+    return slots[:-1], slots[1:] - slots[:-1], page_types, product_idx, category_idx, cart_qty
 
-def session_record(fake: Faker,
-                   user: dict,
-                   products: List[dict],
-                   categories: List[dict],
-                   inv: Inventory,
-                   timespan_days: int) -> Tuple[dict, Optional[dict]]:
+
+def build_page_views_py(timestamps: List[str], durations: np.ndarray, ptypes: np.ndarray,
+                        pidxs: np.ndarray, cidxs: np.ndarray, qtys: np.ndarray,
+                        products: List[dict], categories: List[dict],
+                        page_types: List[str]) -> Tuple[List[dict], set, Dict[str, dict]]:
     """
-    Build one session record.
-    Returns (session_doc, maybe_transaction_doc).
+    Turn the synth_session_core arrays into page_views dicts, the viewed
+    product ids and the cart. Pure-Python twin of _fastgen.build_page_views.
     """
-    session_id = f"sess_{rand_hex(10)}"
-    start = fake.date_time_between(start_date=f"-{timespan_days}d", end_date="now")
-    duration = random.randint(30, 3600)
-    end = start + dt.timedelta(seconds=duration)
-
-    device = {
-        "type": random.choice(DEVICE_TYPES),
-        "os": random.choice(OS_TYPES),
-        "browser": random.choice(BROWSERS)
-    }
-
     page_views = []
     viewed_products = set()
     cart_contents: Dict[str, dict] = {}
 
-    # Map category_id for product_detail/category_listing pages
-    cat_lookup = {c["category_id"]: c for c in categories}
-
-    slots = make_page_flow(duration)
-    for i in range(len(slots) - 1):
-        view_duration = slots[i + 1] - slots[i]
-        ptype = choose_page_type(i, page_views)
-
+    durations, ptypes, pidxs, cidxs, qtys = (arr.tolist() for arr in (durations, ptypes, pidxs, cidxs, qtys))
+    for i in range(len(timestamps)):
         product_id = None
         category_id = None
 
-        if ptype == "category_listing":
-            cat = random.choice(categories)
-            category_id = cat["category_id"]
-
-        elif ptype == "product_detail":
-            # Prefer active, in-stock products for better conversion realism
-            # Try a few picks
-            chosen = None
-            for _ in range(5):
-                cand = random.choice(products)
-                if cand["is_active"] and cand["current_stock"] > 0:
-                    chosen = cand
-                    break
-            if chosen is None:
-                chosen = random.choice(products)
-
+        if pidxs[i] >= 0:
+            chosen = products[pidxs[i]]
             product_id = chosen["product_id"]
             category_id = chosen["category_id"]
             viewed_products.add(product_id)
+            if qtys[i]:
+                entry = cart_contents.setdefault(product_id, {"quantity": 0, "price": chosen["base_price"]})
+                entry["quantity"] += qtys[i]
+        elif cidxs[i] >= 0:
+            category_id = categories[cidxs[i]]["category_id"]
 
-            # Add to cart with 30% probability
-            if random.random() < 0.30:
-                if product_id not in cart_contents:
-                    cart_contents[product_id] = {"quantity": 0, "price": chosen["base_price"]}
-
-                # Add 1–3 units respecting current stock
-                remaining = inv.products[product_id]["current_stock"] - cart_contents[product_id]["quantity"]
-                if remaining > 0:
-                    add_qty = random.randint(1, min(3, remaining))
-                    cart_contents[product_id]["quantity"] += add_qty
-
-        # Timestamp for this page view
-        pv_time = start + dt.timedelta(seconds=slots[i])
         page_views.append({
-            "timestamp": iso(pv_time),
-            "page_type": ptype,
+            "timestamp": timestamps[i],
+            "page_type": page_types[ptypes[i]],
             "product_id": product_id,
             "category_id": category_id,
-            "view_duration": int(view_duration)
+            "view_duration": durations[i]
         })
 
+    return page_views, viewed_products, cart_contents
+
+
+try:
+    # Optional compiled version, build with: python setup.py build_ext --inplace
+    from _fastgen import build_page_views
+except ImportError:
+    build_page_views = build_page_views_py
+
+
+def pick_product_and_category(products: List[dict], categories: List[dict]) -> Tuple[Optional[dict], Optional[dict]]:
+    p = random.choice(products)
+    # Find category quickly by id (build once in caller if you want)
+    cat = None
+    return p, cat
+
+
+def draw_session_params(rng: np.random.Generator, n: int, n_users: int,
+                        timespan_days: int) -> Tuple[List[int], List[tuple]]:
+    """
+    Pre-draw the per-session scalars of a whole chunk, one vectorized call per field.
+    Returns (user indexes, params) where each params tuple is
+    (start, duration, device type idx, os idx, browser idx, referrer idx, conversion roll).
+    """
+    now = wall_clock_now()
+    user_idx = rng.integers(0, n_users, n)
+    cols = (
+        rng.integers(now - timespan_days * 86400, now + 1, n),
+        rng.integers(30, 3601, n),
+        rng.integers(0, len(DEVICE_TYPES), n),
+        rng.integers(0, len(OS_TYPES), n),
+        rng.integers(0, len(BROWSERS), n),
+        np.searchsorted(REFERRER_CUM, rng.random(n) * REFERRER_CUM[-1], side="right"),
+        rng.random(n),
+    )
+    return user_idx.tolist(), list(zip(*(c.tolist() for c in cols)))
+
+
+def session_record(rng: np.random.Generator,
+                   params: tuple,
+                   user: dict,
+                   products: List[dict],
+                   categories: List[dict],
+                   inv: Inventory) -> Tuple[dict, Optional[dict]]:
+    """
+    Build one session record from its pre-drawn params (see draw_session_params).
+    Returns (session_doc, maybe_transaction_doc).
+    """
+    start, duration, type_i, os_i, browser_i, referrer_i, convert_roll = params
+    session_id = f"sess_{rand_hex(10)}"
+    end = start + duration
+
+    device = {
+        "type": DEVICE_TYPES[type_i],
+        "os": OS_TYPES[os_i],
+        "browser": BROWSERS[browser_i]
+    }
+
+    offsets, durations, ptypes, pidxs, cidxs, qtys = synth_session_core(
+        rng, duration, inv.stock, inv.active, len(categories)
+    )
+    # Timestamp for each page view
+    timestamps = [iso_epoch(start + off) for off in offsets.tolist()]
+    page_views, viewed_products, cart_contents = build_page_views(
+        timestamps, durations, ptypes, pidxs, cidxs, qtys, products, categories, PAGE_TYPES
+    )
+
     # Derive conversion_status
     did_checkout = any(pv["page_type"] == "checkout" for pv in page_views)
     has_cart = any(v["quantity"] > 0 for v in cart_contents.values())
@@ -336,26 +571,26 @@ def session_record(fake: Faker,
     if did_checkout and has_cart:
         convert_prob = 0.45
 
-    converted = (random.random() < convert_prob) and has_cart
+    converted = (convert_roll < convert_prob) and has_cart
 
     session_doc = {
         "session_id": session_id,
         "user_id": user["user_id"],
-        "start_time": iso(start),
-        "end_time": iso(end),
+        "start_time": iso_epoch(start),
+        "end_time": iso_epoch(end),
         "duration_seconds": int(duration),
         "geo_data": {
             "city": user["geo_data"]["city"],
             "state": user["geo_data"]["state"],
             "country": user["geo_data"]["country"],
-            "ip_address": fake.ipv4_public()
+            "ip_address": rand_ipv4_public()
         },
         "device_profile": device,
         "viewed_products": sorted(viewed_products),
         "page_views": page_views,
         "cart_contents": {k: v for k, v in cart_contents.items() if v["quantity"] > 0},
         "conversion_status": "converted" if converted else ("abandoned_cart" if has_cart else "browsing"),
-        "referrer": weighted_choice(REFERRERS)
+        "referrer": REFERRER_NAMES[referrer_i]
     }
 
     tx_doc = None
@@ -368,7 +603,7 @@ def session_record(fake: Faker,
             if qty <= 0:
                 continue
             # Ensure we can reserve stock
-            if inv.reserve(pid, qty):
+            if inv.reserve(inv.index[pid], qty):
                 unit_price = float(entry["price"])
                 line_sub = round(qty * unit_price, 2)
                 items.append({
@@ -392,7 +627,7 @@ def session_record(fake: Faker,
                 "transaction_id": f"txn_{rand_hex(12)}",
                 "session_id": session_id,
                 "user_id": user["user_id"],
-                "timestamp": iso(end),
+                "timestamp": iso_epoch(end),
                 "items": items,
                 "subtotal": subtotal,
                 "discount": discount,
@@ -407,7 +642,7 @@ def session_record(fake: Faker,
     return session_doc, tx_doc
 
 
-def gen_orphan_transaction(fake: Faker, user: dict, products: List[dict], inv: Inventory, timespan_days: int) -> Optional[dict]:
+def gen_orphan_transaction(user: dict, products: List[dict], inv: Inventory, timespan_days: int) -> Optional[dict]:
     """
     Transaction not linked to a session (session_id = null), per PDF sample.
     """
@@ -420,12 +655,13 @@ def gen_orphan_transaction(fake: Faker, user: dict, products: List[dict], inv: I
     for _ in range(n_items * 3):
         if len(items) >= n_items:
             break
-        p = random.choice(products)
-        if not p["is_active"] or p["current_stock"] <= 0:
+        i = random.randrange(len(products))
+        if not inv.active[i] or inv.stock[i] <= 0:
             continue
+        p = products[i]
         pid = p["product_id"]
         qty = random.randint(1, 3)
-        if inv.reserve(pid, qty):
+        if inv.reserve(i, qty):
             unit_price = float(p["base_price"])
             line_sub = round(qty * unit_price, 2)
             items.append({"product_id": pid, "quantity": qty, "unit_price": unit_price, "subtotal": line_sub})
@@ -441,12 +677,13 @@ def gen_orphan_transaction(fake: Faker, user: dict, products: List[dict], inv: I
         discount = round(subtotal * discount_rate, 2)
 
     total = round(subtotal - discount, 2)
+    now = wall_clock_now()
 
     return {
         "transaction_id": f"txn_{rand_hex(12)}",
         "session_id": None,
         "user_id": user["user_id"],
-        "timestamp": iso(fake.date_time_between(start_date=f"-{timespan_days}d", end_date="now")),
+        "timestamp": iso_epoch(random.randint(now - timespan_days * 86400, now)),
         "items": items,
         "subtotal": subtotal,
         "discount": discount,
@@ -456,6 +693,60 @@ def gen_orphan_transaction(fake: Faker, user: dict, products: List[dict], inv: I
     }
 
 
+# ----------------------------
+# Session chunks (run in worker processes)
+# ----------------------------
+# Per-process snapshot used by generate_session_chunk, set by init_chunk_worker
+_CHUNK_CTX: Dict[str, object] = {}
+
+
+def seed_stream(seed: int, stream: int) -> np.random.Generator:
+    """Seed `random` and return a NumPy Generator for one independent stream of `seed`."""
+    ss = np.random.SeedSequence([seed, stream])
+    random.seed(int(ss.generate_state(1)[0]))
+    return np.random.default_rng(ss)
+
+
+def init_chunk_worker(users: List[dict], products: List[dict], categories: List[dict],
+                      out_dir: str, timespan_days: int, seed: int, legacy_json: bool) -> None:
+    _CHUNK_CTX.update(
+        users=users, products=products, categories=categories, out_dir=out_dir,
+        timespan_days=timespan_days, seed=seed, legacy_json=legacy_json,
+    )
+
+
+def generate_session_chunk(chunk_idx: int, n: int) -> Tuple[int, List[dict], np.ndarray]:
+    """
+    Write sessions_{chunk_idx}.json with n sessions.
+    Returns (sessions written, transactions made, units of stock consumed per product).
+    RNG streams come from (seed, chunk_idx) and stock starts from the initial
+    product snapshot, so the output does not depend on the number of workers.
+    """
+    ctx = _CHUNK_CTX
+    users, products, categories = ctx["users"], ctx["products"], ctx["categories"]
+    rng = seed_stream(ctx["seed"], chunk_idx)
+    inv = Inventory(products)
+    start_stock = inv.stock.copy()
+    txs: List[dict] = []
+    user_idx, params = draw_session_params(rng, n, len(users), ctx["timespan_days"])
+
+    def iter_sessions():
+        for i in range(n):
+            sess_doc, tx_doc = session_record(rng, params[i], users[user_idx[i]], products, categories, inv)
+            if tx_doc:
+                txs.append(tx_doc)
+            yield sess_doc
+
+    write_records = write_json_array if ctx["legacy_json"] else write_json_lines
+    wrote = write_records(
+        os.path.join(ctx["out_dir"], f"sessions_{chunk_idx}.json"),
+        iter_sessions(),
+        progress_every=0,
+        label=f"sessions_{chunk_idx}"
+    )
+    return wrote, txs, start_stock - inv.stock
+
+
 # ----------------------------
 # Main
 # ----------------------------
@@ -477,42 +768,58 @@ def main():
     parser.add_argument("--subcats-max", type=int, default=6)
 
     parser.add_argument("--progress-every", type=int, default=20000, help="Print progress every N sessions (default 20,000)")
+    parser.add_argument("--faker-pool-size", type=int, default=10000,
+                        help="Max pre-generated Faker values per provider (default 10,000)")
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1),
+                        help="Processes generating session chunks in parallel (default: min(4, CPUs))")
+    parser.add_argument("--legacy-json", action="store_true",
+                        help="Write JSON arrays instead of JSON Lines (one object per line)")
 
     args = parser.parse_args()
 
     random.seed(args.seed)
-    fake = Faker()
+    rng = np.random.default_rng(args.seed)
+    # en_US only: keeps every string ASCII (checked below when run without -O)
+    fake = Faker("en_US")
     Faker.seed(args.seed)
+    pools = build_faker_pools(
+        fake, args.faker_pool_size,
+        num_categories=args.num_categories,
+        num_subcats=args.num_categories * args.subcats_max,
+        num_products=args.num_products,
+        num_users=args.num_users,
+    )
+    assert all(v.isascii() for pool in pools.values() for v in pool), "non-ASCII Faker output"
 
     out_dir = args.out
     os.makedirs(out_dir, exist_ok=True)
+    write_records = write_json_array if args.legacy_json else write_json_lines
 
     # --- Categories ---
     print("Generating categories...")
-    categories = gen_categories(fake, args.num_categories, (args.subcats_min, args.subcats_max))
+    categories = gen_categories(rng, pools, args.num_categories, (args.subcats_min, args.subcats_max))
     cat_path = os.path.join(out_dir, "categories.json")
-    write_json_array(cat_path, iter(categories), label="categories")
+    write_records(cat_path, iter(categories), label="categories")
     print(f"Saved categories: {len(categories):,} -> {cat_path}")
 
     # --- Products ---
     print("Generating products...")
-    products = gen_products(fake, categories, args.num_products, args.timespan_days)
+    products = gen_products(rng, pools, categories, args.num_products, args.timespan_days)
     inv = Inventory(products)
     prod_path = os.path.join(out_dir, "products.json")
-    write_json_array(prod_path, iter(products), label="products")
+    write_records(prod_path, iter(products), label="products")
     print(f"Saved products: {len(products):,} -> {prod_path}")
 
     # --- Users ---
     print("Generating users...")
-    users = gen_users(fake, args.num_users, args.timespan_days)
+    users = gen_users(rng, pools, args.num_users, args.timespan_days)
     user_path = os.path.join(out_dir, "users.json")
-    write_json_array(user_path, iter(users), label="users")
+    write_records(user_path, iter(users), label="users")
     print(f"Saved users: {len(users):,} -> {user_path}")
 
     # --- Sessions + Transactions (streamed) ---
-    print("Generating sessions and transactions (streamed)...")
+    print(f"Generating sessions and transactions (streamed, {args.workers} worker(s))...")
 
-    # Prepare transactions.json (streamed JSON array)
     tx_path = os.path.join(out_dir, "transactions.json")
     tx_written = 0
     tx_target = args.num_transactions
@@ -521,79 +828,53 @@ def main():
     # Session chunk files
     chunk_size = args.sessions_chunk_size
     sess_written = 0
-    chunk_idx = 0
+    n_chunks = math.ceil(sess_target / chunk_size) if sess_target > 0 else 0
+    chunk_sizes = [min(chunk_size, sess_target - i * chunk_size) for i in range(n_chunks)]
+    ctx_args = (users, products, categories, out_dir, args.timespan_days, args.seed, args.legacy_json)
 
-    def iter_sessions_for_chunk(n: int):
-        nonlocal tx_written
-        # Yield sessions and push transactions to transactions stream
-        for _ in range(n):
-            user = random.choice(users)
-            sess_doc, tx_doc = session_record(fake, user, products, categories, inv, args.timespan_days)
-            if tx_doc and tx_written < tx_target:
-                # mark to be written in tx stream by outer scope
-                tx_buffer.append(tx_doc)
-                tx_written += 1
-            yield sess_doc
+    def iter_transactions(chunk_results):
+        # Collects finished chunks in order and yields their transactions, then tops up with orphans
+        nonlocal sess_written, tx_written
 
-    # We stream-write transactions.json as a JSON array
-    os.makedirs(os.path.dirname(tx_path) or ".", exist_ok=True)
-    with open(tx_path, "w", encoding="utf-8") as txf:
-        txf.write("[\n")
-        tx_first = True
-
-        # Generate sessions in chunks
-        while sess_written < sess_target:
-            remaining = sess_target - sess_written
-            this_chunk = min(chunk_size, remaining)
-
-            sessions_file = os.path.join(out_dir, f"sessions_{chunk_idx}.json")
-            tx_buffer: List[dict] = []
-
-            # Stream-write this sessions chunk
-            def sess_iter():
-                return iter_sessions_for_chunk(this_chunk)
-
-            wrote = write_json_array(
-                sessions_file,
-                sess_iter(),
-                progress_every=0,
-                label=f"sessions_{chunk_idx}"
-                
-            )
+        for wrote, chunk_txs, consumed in chunk_results:
             sess_written += wrote
-
-            # Flush any tx_buffer gathered during this chunk
-            for tx_doc in tx_buffer:
-                if not tx_first:
-                    txf.write(",\n")
-                tx_first = False
-                txf.write(json.dumps(tx_doc, ensure_ascii=False))
+            inv.apply_consumption(consumed)
+            for tx_doc in chunk_txs[:max(0, tx_target - tx_written)]:
+                tx_written += 1
+                yield tx_doc
 
             if args.progress_every and sess_written % args.progress_every == 0:
                 print(f"Progress: {sess_written:,}/{sess_target:,} sessions, {tx_written:,}/{tx_target:,} transactions")
 
-            chunk_idx += 1
-
         # If we still need more transactions, generate "orphan" transactions (session_id=null)
+        seed_stream(args.seed, n_chunks)
         while tx_written < tx_target:
             user = random.choice(users)
-            tx_doc = gen_orphan_transaction(fake, user, products, inv, args.timespan_days)
+            tx_doc = gen_orphan_transaction(user, products, inv, args.timespan_days)
             if not tx_doc:
                 continue
-            if not tx_first:
-                txf.write(",\n")
-            tx_first = False
-            txf.write(json.dumps(tx_doc, ensure_ascii=False))
             tx_written += 1
+            yield tx_doc
             if tx_written % max(1, (args.progress_every // 2)) == 0:
                 print(f"Progress: {sess_written:,}/{sess_target:,} sessions, {tx_written:,}/{tx_target:,} transactions")
 
-        txf.write("\n]\n")
-
-    # Re-save products at the end to reflect stock reductions from purchases
-    prod_final_path = os.path.join(out_dir, "products.json")
-    write_json_array(prod_final_path, iter(inv.products.values()), label="products_final")
-    remaining_stock = sum(p["current_stock"] for p in inv.products.values())
+    if args.workers > 1 and n_chunks > 1:
+        with ProcessPoolExecutor(max_workers=args.workers, initializer=init_chunk_worker,
+                                 initargs=ctx_args) as pool:
+            results = pool.map(generate_session_chunk, range(n_chunks), chunk_sizes)
+            write_records(tx_path, iter_transactions(results), label="transactions")
+    else:
+        init_chunk_worker(*ctx_args)
+        results = map(generate_session_chunk, range(n_chunks), chunk_sizes)
+        write_records(tx_path, iter_transactions(results), label="transactions")
+
+    # Only stock/active change after products.json is written, so save just those;
+    # readers merge products_stock.json over products.json by product_id
+    stock_path = os.path.join(out_dir, "products_stock.json")
+    with open(stock_path, "wb") as f:
+        f.write(orjson.dumps(inv.stock_snapshot()))
+    print(f"Saved final stock: {len(inv.products):,} -> {stock_path}")
+    remaining_stock = int(inv.stock.sum())
 
     print("\nDataset generation complete!")
     print(f"- Sessions:      {sess_written:,} (target: {sess_target:,})")
@@ -1,8 +1,31 @@
 import os
-import json
 import glob
+import mmap
 import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
 import happybase
+import msgpack
+import orjson
+
+try:
+    # C backend is ~10x faster than the pure-python one
+    import ijson.backends.yajl2_c as ijson
+except ImportError:
+    import ijson
+
+
+# Per-process connection pool, created by the ProcessPoolExecutor initializer.
+_POOL = None
+
+# Payload columns; the events family stores these names as pointers to them.
+# (Other qualifiers stay inline: bytes literals are code constants, not per-row allocations.)
+Q_PAGE_VIEWS = b"pv:page_views_msgpack"
+Q_CART = b"cart:cart_json"
+
+# Position of each field in the page-view tuples stored in pv:page_views_msgpack.
+# Read back with: [dict(zip(PV_FIELDS, row)) for row in msgpack.unpackb(cell)]
+PV_FIELDS = ("timestamp", "page_type", "product_id", "category_id", "view_duration")
 
 
 def b(x):
@@ -16,21 +39,46 @@ def b(x):
 
 def safe_json_bytes(obj, default=b"[]"):
     try:
-        return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+        return orjson.dumps(obj)
     except Exception:
         return default
 
 
+def pack_page_views(page_views, default=b"\x90"):
+    """msgpack list of positional tuples (see PV_FIELDS); default is an empty array."""
+    try:
+        return msgpack.packb([[pv.get(k) for k in PV_FIELDS] for pv in page_views])
+    except Exception:
+        return default
+
+
+def stream_records(path):
+    """
+    Stream records one dict at a time from a JSON Lines or JSON array file.
+    The file is read through a read-only mmap, so bytes come straight from
+    the page cache and the OS handles paging for multi-GB files.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm[:64].lstrip()[:1] == b"[":
+                # --legacy-json output; use_float keeps prices as float (orjson cannot serialize Decimal)
+                yield from ijson.items(mm, "item", use_float=True)
+            else:
+                for line in iter(mm.readline, b""):
+                    if line.strip():
+                        yield orjson.loads(line)
+
+
 def load_one_file(table, path, max_rows_total, batch_size, already_inserted):
     print(f"\n📥 Loading: {os.path.basename(path)}")
 
-    with open(path, "r", encoding="utf-8") as f:
-        sessions = json.load(f)
-
-    batch = table.batch(batch_size=batch_size)
+    # batch_size makes happybase send() every N puts, which caps client memory
+    batch = table.batch(batch_size=batch_size, transaction=False)
     inserted_this_file = 0
 
-    for s in sessions:
+    for s in stream_records(path):
         if max_rows_total and already_inserted + inserted_this_file >= max_rows_total:
             break
 
@@ -50,9 +98,9 @@ def load_one_file(table, path, max_rows_total, batch_size, already_inserted):
         cart_contents = s.get("cart_contents") or {}
         viewed_products = s.get("viewed_products") or []
 
-        # ---- store pv family (compact summary + JSON) ----
+        # ---- store pv family (compact summary + msgpack tuples) ----
         pv_count = len(page_views)
-        pv_json = safe_json_bytes(page_views, default=b"[]")
+        pv_packed = pack_page_views(page_views)
 
         # ---- store cart family (summary + JSON) ----
         # cart_contents might be dict or list depending on your generator
@@ -93,15 +141,15 @@ def load_one_file(table, path, max_rows_total, batch_size, already_inserted):
 
             # ----- pv (page views) -----
             b"pv:count": b(pv_count),
-            b"pv:page_views_json": pv_json,
+            Q_PAGE_VIEWS: pv_packed,
 
             # ----- cart -----
             b"cart:distinct_items": b(cart_items_count),
-            b"cart:cart_json": cart_json,
+            Q_CART: cart_json,
 
-            # ----- events (keep full JSON copies too) -----
-            b"events:page_views_json": pv_json,
-            b"events:cart_json": cart_json,
+            # ----- events (pointers only; the payloads live once in pv/cart) -----
+            b"events:pv_ref": Q_PAGE_VIEWS,
+            b"events:cart_ref": Q_CART,
         }
 
         batch.put(rowkey, data)
@@ -115,6 +163,62 @@ def load_one_file(table, path, max_rows_total, batch_size, already_inserted):
     return inserted_this_file
 
 
+def _init_worker(host, port):
+    """Open one Thrift connection per worker process (reused across files)."""
+    global _POOL
+    _POOL = happybase.ConnectionPool(size=1, host=host, port=port, timeout=60000)
+
+
+def _load_file_in_worker(table_name, path, batch_size):
+    with _POOL.connection() as conn:
+        return load_one_file(
+            table=conn.table(table_name),
+            path=path,
+            max_rows_total=0,
+            batch_size=batch_size,
+            already_inserted=0,
+        )
+
+
+def load_sequential(args, files):
+    conn = happybase.Connection(host=args.host, port=args.port, timeout=60000)
+    conn.open()
+    table = conn.table(args.table)
+
+    total = 0
+    for fp in files:
+        total += load_one_file(
+            table=table,
+            path=fp,
+            max_rows_total=args.max_rows if args.max_rows > 0 else 0,
+            batch_size=args.batch_size,
+            already_inserted=total,
+        )
+        if args.max_rows and total >= args.max_rows:
+            break
+
+    conn.close()
+    return total
+
+
+def load_parallel(args, files):
+    """One file per task; each worker process holds its own Thrift socket."""
+    total = 0
+    with ProcessPoolExecutor(
+        max_workers=args.workers,
+        initializer=_init_worker,
+        initargs=(args.host, args.port),
+    ) as pool:
+        futures = {
+            pool.submit(_load_file_in_worker, args.table, fp, args.batch_size): fp
+            for fp in files
+        }
+        for fut in as_completed(futures):
+            total += fut.result()
+            print(f"📊 {total:,} sessions inserted so far ({os.path.basename(futures[fut])} finished)")
+    return total
+
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--host", default="localhost")
@@ -123,8 +227,10 @@ def main():
 
     ap.add_argument("--pattern", default="sessions_*.json")
     ap.add_argument("--max-files", type=int, default=0, help="0 = all files")
-    ap.add_argument("--max-rows", type=int, default=0, help="0 = all rows total")
-    ap.add_argument("--batch-size", type=int, default=500)
+    ap.add_argument("--max-rows", type=int, default=0, help="0 = all rows total (forces a single worker)")
+    ap.add_argument("--batch-size", type=int, default=2000)
+    ap.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1),
+                    help="Parallel loader processes, one file each (default: min(4, CPUs))")
 
     args = ap.parse_args()
 
@@ -141,23 +247,13 @@ def main():
     print("🧾 Files:", [os.path.basename(f) for f in files])
     print(f"📌 Target table: {args.table}  |  Thrift: {args.host}:{args.port}")
 
-    conn = happybase.Connection(host=args.host, port=args.port, timeout=60000)
-    conn.open()
-    table = conn.table(args.table)
-
-    total = 0
-    for fp in files:
-        total += load_one_file(
-            table=table,
-            path=fp,
-            max_rows_total=args.max_rows if args.max_rows > 0 else 0,
-            batch_size=args.batch_size,
-            already_inserted=total,
-        )
-        if args.max_rows and total >= args.max_rows:
-            break
+    # A global --max-rows cap depends on file order, so it stays sequential
+    if args.workers > 1 and len(files) > 1 and not args.max_rows:
+        print(f"⚙️  Workers: {args.workers}")
+        total = load_parallel(args, files)
+    else:
+        total = load_sequential(args, files)
 
-    conn.close()
     print(f"\n🎉 ALL DONE. Total inserted into '{args.table}': {total:,}")
 
 
@@ -0,0 +1,16 @@
+"""
+Builds the optional Cython accelerator used by dataset_generator.py:
+
+    python setup.py build_ext --inplace
+
+Without it the generator falls back to the pure-Python build_page_views_py.
+"""
+
+from setuptools import setup
+from Cython.Build import cythonize
+
+setup(
+    name="fastgen",
+    # No profile/linetrace directives: they disable C compiler optimizations
+    ext_modules=cythonize("_fastgen.pyx"),
+)
@@ -1,85 +1,181 @@
 import argparse
+import os
+
+import pandas as pd
+from pyspark import StorageLevel
 from pyspark.sql import SparkSession, functions as F
+from pyspark.sql.functions import pandas_udf
+from pyspark.sql.types import (
+    ArrayType, DoubleType, IntegerType, StringType, StructField, StructType,
+)
+
+# Only the fields the tasks use; the JSON reader skips inference and the rest
+TX_SCHEMA = StructType([
+    StructField("transaction_id", StringType()),
+    StructField("user_id", StringType()),
+    StructField("total", DoubleType()),
+    StructField("items", ArrayType(StructType([
+        StructField("product_id", StringType()),
+        StructField("quantity", IntegerType()),
+        StructField("subtotal", DoubleType()),
+    ]))),
+])
+
+PRODUCTS_SCHEMA = StructType([
+    StructField("product_id", StringType()),
+    StructField("category_id", StringType()),
+])
+
+
+def save_small(df, path: str):
+    """Collect an already-limited result and write it as <path>.csv and <path>.parquet."""
+    pdf = df.toPandas()
+    pdf.to_csv(f"{path}.csv", index=False)
+    pdf.to_parquet(f"{path}.parquet", index=False)
+
+
+def load_inputs(spark, in_dir: str, fmt: str):
+    """Read products/transactions as JSON, or as Parquet (converted once from JSON)."""
+    sources = {"products": PRODUCTS_SCHEMA, "transactions": TX_SCHEMA}
+    if fmt == "json":
+        return [spark.read.json(f"{in_dir}/{name}.json", schema=schema)
+                for name, schema in sources.items()]
+
+    for name, schema in sources.items():
+        pq_path = f"{in_dir}/{name}.parquet"
+        if not os.path.exists(pq_path):
+            print(f"Converting {name}.json -> {name}.parquet (one time)")
+            spark.read.json(f"{in_dir}/{name}.json", schema=schema).write.parquet(pq_path)
+    return [spark.read.parquet(f"{in_dir}/{name}.parquet") for name in sources]
 
-def main(in_dir: str, out_dir: str):
+
+def main(in_dir: str, out_dir: str, fmt: str = "json", explain: bool = False,
+         master: str = "local[*]", driver_memory: str = "4g"):
     spark = (
         SparkSession.builder
         .appName("EcommerceBatchAnalytics")
-        .master("local[2]")               # safe for 8GB
-        .config("spark.driver.memory", "2g")
-        .config("spark.sql.shuffle.partitions", "8")
+        .master(master)                   # 8GB machines: local[4] with 3g
+        .config("spark.driver.memory", driver_memory)
+        .config("spark.memory.fraction", "0.6")
+        .config("spark.sql.shuffle.partitions", "16")   # starting point, AQE coalesces
+        .config("spark.sql.adaptive.enabled", "true")
+        .config("spark.sql.adaptive.coalescePartitions.enabled", "true")
+        .config("spark.sql.adaptive.skewJoin.enabled", "true")
+        .config("spark.sql.adaptive.skewJoin.skewedPartitionFactor", "5")
+        .config("spark.sql.adaptive.advisoryPartitionSizeInBytes", "64MB")
+        .config("spark.sql.autoBroadcastJoinThreshold", "50MB")
         .getOrCreate()
     )
 
-    # ---------- Load JSON ----------
-    products = spark.read.json(f"{in_dir}/products.json")
-    tx = spark.read.json(f"{in_dir}/transactions.json")
+    # ---------- Load inputs ----------
+    products, tx = load_inputs(spark, in_dir, fmt)
+    tx = tx.persist(StorageLevel.MEMORY_AND_DISK)   # scanned by all three tasks
 
     # explode items
     tx_items = (
-        tx.select("transaction_id", "user_id", "timestamp", F.explode("items").alias("it"))
+        tx.select("transaction_id", F.explode("items").alias("it"))
           .select(
-              "transaction_id", "user_id", "timestamp",
+              "transaction_id",
               F.col("it.product_id").alias("product_id"),
               F.col("it.quantity").alias("quantity"),
               F.col("it.subtotal").alias("subtotal")
           )
     )
 
+    # pair mining only needs the ids: explode the nested field on its own
+    tx_pids = tx.select("transaction_id", F.explode("items.product_id").alias("product_id"))
+
     # =========================================================
     # Task 1: "Users who bought X also bought Y" (Top 50 pairs)
     # =========================================================
+    # sorted, de-duplicated baskets: joining on a.pos < b.pos then yields each
+    # unordered pair once with a.pid < b.pid (triangle, not the full square)
+    basket_items = (
+        tx_pids.groupBy("transaction_id")
+        .agg(F.array_sort(F.collect_set("product_id")).alias("pids"))
+        .select("transaction_id", F.posexplode("pids").alias("pos", "pid"))
+    )
+
     pairs = (
-        tx_items.select("transaction_id", "product_id")
-        .distinct()
-        .alias("a")
+        basket_items.alias("a")
         .join(
-            tx_items.select("transaction_id", "product_id").distinct().alias("b"),
-            on="transaction_id"
+            basket_items.alias("b"),
+            (F.col("a.transaction_id") == F.col("b.transaction_id"))
+            & (F.col("a.pos") < F.col("b.pos"))
         )
-        .where(F.col("a.product_id") < F.col("b.product_id"))
         .groupBy(
-            F.col("a.product_id").alias("product_x"),
-            F.col("b.product_id").alias("product_y")
+            F.col("a.pid").alias("product_x"),
+            F.col("b.pid").alias("product_y")
         )
+        # count() plans as a partial HashAggregate before the exchange, i.e. a
+        # map-side combiner already; an RDD reduceByKey would only add Python
+        # pickling of every pair row on top of the same shuffle. Baskets come
+        # from collect_set, so count("*") is already the exact number of
+        # distinct transactions per pair, in one long per group
         .agg(F.count("*").alias("co_purchase_count"))
         .orderBy(F.desc("co_purchase_count"))
         .limit(50)
     )
 
-    pairs.coalesce(1).write.mode("overwrite").option("header", True).csv(f"{out_dir}/also_bought_top50")
+    # orderBy + limit right after the aggregate plans as TakeOrderedAndProject
+    # (per-partition top-K), not a global sort; --explain shows the plan
+    if explain:
+        pairs.explain()
+
+    # already limited to 50 rows: collect and write locally instead of funnelling
+    # the aggregate through a single coalesce(1) task
+    os.makedirs(out_dir, exist_ok=True)
+    save_small(pairs, f"{out_dir}/also_bought_top50")
 
     # ==========================================
     # Task 2: Revenue by category (Spark SQL-ish)
     # ==========================================
-    prod_sel = products.select("product_id", "category_id", "name")
+    # products is tiny next to tx_items: ship product -> category as a broadcast
+    # dict and map it per Arrow batch, so the large side needs no join at all
+    cat_map = spark.sparkContext.broadcast(
+        {r.product_id: r.category_id for r in products.select("product_id", "category_id").collect()}
+    )
+
+    @pandas_udf(StringType())
+    def to_category(pid: pd.Series) -> pd.Series:
+        return pid.map(cat_map.value)
 
     revenue_by_cat = (
-        tx_items.join(prod_sel, on="product_id", how="left")
+        tx_items.withColumn("category_id", to_category("product_id"))
         .groupBy("category_id")
         .agg(
             F.round(F.sum("subtotal"), 2).alias("revenue"),
             F.sum("quantity").alias("units_sold"),
-            F.countDistinct("transaction_id").alias("orders")
+            F.approx_count_distinct("transaction_id", 0.02).alias("orders")   # HLL++, ~2% error
         )
         .orderBy(F.desc("revenue"))
+        .cache()   # written twice (CSV + Parquet)
     )
 
-    revenue_by_cat.coalesce(1).write.mode("overwrite").option("header", True).csv(f"{out_dir}/revenue_by_category")
+    revenue_by_cat.write.mode("overwrite").option("header", True).csv(f"{out_dir}/revenue_by_category")
+    revenue_by_cat.write.mode("overwrite").parquet(f"{out_dir}/revenue_by_category.parquet")
+    revenue_by_cat.unpersist()
 
     # ==================================
     # Task 3: Top spenders (extra insight)
     # ==================================
     top_spenders = (
-        tx.groupBy("user_id")
+        # total is after discount, so it can't be rebuilt from item subtotals
+        tx.select("user_id", "total")
+          .groupBy("user_id")
           .agg(F.round(F.sum("total"), 2).alias("total_spent"),
                F.count("*").alias("num_orders"))
           .orderBy(F.desc("total_spent"))
           .limit(20)
     )
 
-    top_spenders.coalesce(1).write.mode("overwrite").option("header", True).csv(f"{out_dir}/top_spenders")
+    if explain:
+        top_spenders.explain()
+
+    save_small(top_spenders, f"{out_dir}/top_spenders")
 
+    cat_map.unpersist()
+    tx.unpersist()
     spark.stop()
     print("DONE ✅ Spark outputs saved to:", out_dir)
 
@@ -87,5 +183,12 @@ if __name__ == "__main__":
     ap = argparse.ArgumentParser()
     ap.add_argument("--in", dest="in_dir", required=True)
     ap.add_argument("--out", dest="out_dir", required=True)
+    ap.add_argument("--format", choices=["json", "parquet"], default="json",
+                    help="parquet converts the JSON inputs once and reads Parquet after that")
+    ap.add_argument("--explain", action="store_true",
+                    help="print the physical plans of the top-N queries")
+    ap.add_argument("--master", default="local[*]")
+    ap.add_argument("--driver-memory", default="4g")
     args = ap.parse_args()
-    main(args.in_dir, args.out_dir)
+    main(args.in_dir, args.out_dir, args.format, args.explain,
+         args.master, args.driver_memory)
@@ -1,12 +1,16 @@
 # plots_from_spark_outputs.py
 # --------------------------------------------
-# Generate report-ready plots from Spark CSV outputs
+# Generate report-ready plots from Spark outputs (Parquet, else CSV files/part folders)
 # Works on 8GB RAM (small CSVs)
 # --------------------------------------------
 
 import os
 import glob
 import pandas as pd
+import pyarrow as pa
+from pyarrow import csv as pacsv
+import matplotlib
+matplotlib.use("Agg")   # files only: skip GUI backend probing
 import matplotlib.pyplot as plt
 
 
@@ -19,54 +23,73 @@ OUT_DIR = os.path.join(BASE_DIR, "_plots")
 os.makedirs(OUT_DIR, exist_ok=True)
 
 
-def find_single_csv(folder: str) -> str:
-    """Find the single part-*.csv produced by Spark in a folder."""
-    pattern = os.path.join(folder, "*.csv")
-    files = glob.glob(pattern)
+def find_csvs(name: str) -> list:
+    """Find <name>.csv, or else the non-empty part-*.csv files Spark wrote to <name>/."""
+    single = os.path.join(BASE_DIR, name + ".csv")
+    if os.path.isfile(single):
+        return [single]
+    pattern = os.path.join(BASE_DIR, name, "*.csv")
+    files = [f for f in sorted(glob.glob(pattern)) if os.path.getsize(f) > 0]
     if not files:
-        raise FileNotFoundError(f"No CSV found in: {folder}")
-    # pick first (Spark usually writes part-00000*.csv)
-    return files[0]
+        raise FileNotFoundError(f"No CSV found for: {name}")
+    return files
 
 
-def save_bar(df, x_col, y_col, title, out_png, top_n=10, rotate=45):
-    """Generic bar plot saver (no manual colors)."""
-    d = df.copy()
-    d = d.sort_values(y_col, ascending=False).head(top_n)
+def find_output(name: str):
+    """Return the Parquet copy of a Spark output (file or part-file folder), if any."""
+    path = os.path.join(BASE_DIR, name + ".parquet")
+    return path if os.path.exists(path) else None
 
-    plt.figure(figsize=(10, 5))
-    plt.bar(d[x_col].astype(str), d[y_col])
-    plt.title(title)
-    plt.xlabel(x_col)
-    plt.ylabel(y_col)
-    plt.xticks(rotation=rotate, ha="right")
-    plt.tight_layout()
-    plt.savefig(out_png, dpi=200)
-    plt.close()
+
+def read_output(name: str, column_types: dict) -> pd.DataFrame:
+    """Read a Spark output, preferring Parquet (already typed) over CSV."""
+    path = find_output(name)
+    if path is not None:
+        return pd.read_parquet(path)
+    return read_spark_csv(name, column_types)
+
+
+def read_spark_csv(name: str, column_types: dict) -> pd.DataFrame:
+    """Read one Spark output with PyArrow, typed at parse time, concatenating part files."""
+    opts = pacsv.ConvertOptions(column_types=column_types)
+    tables = [pacsv.read_csv(f, convert_options=opts) for f in find_csvs(name)]
+    return pa.concat_tables(tables).to_pandas()
+
+
+def save_bar(ax, df, x_col, y_col, title, out_png, top_n=10, rotate=45):
+    """Generic bar plot saver (no manual colors); redraws on a reused Axes."""
+    d = df.nlargest(top_n, y_col)
+
+    ax.cla()
+    ax.bar(d[x_col].astype(str), d[y_col])
+    ax.set_title(title)
+    ax.set_xlabel(x_col)
+    ax.set_ylabel(y_col)
+    plt.setp(ax.get_xticklabels(), rotation=rotate, ha="right")
+    ax.figure.tight_layout()
+    ax.figure.savefig(out_png, dpi=200)
 
 
 def main():
+    # one figure for all plots; save_bar clears and redraws it
+    fig, ax = plt.subplots(figsize=(10, 5))
+
     # -------------------------
     # 1) Revenue by Category
     # -------------------------
-    rev_dir = os.path.join(BASE_DIR, "revenue_by_category")
-    rev_csv = find_single_csv(rev_dir)
-    rev = pd.read_csv(rev_csv)
-
-    # Ensure numeric
-    rev["revenue"] = pd.to_numeric(rev["revenue"], errors="coerce")
-    rev["units_sold"] = pd.to_numeric(rev["units_sold"], errors="coerce")
-    rev["orders"] = pd.to_numeric(rev["orders"], errors="coerce")
+    rev = read_output("revenue_by_category", {
+        "revenue": pa.float64(), "units_sold": pa.int64(), "orders": pa.int64(),
+    })
 
     save_bar(
-        rev, "category_id", "revenue",
+        ax, rev, "category_id", "revenue",
         "Revenue by Category (Top 10)",
         os.path.join(OUT_DIR, "01_revenue_by_category_top10.png"),
         top_n=10
     )
 
     save_bar(
-        rev, "category_id", "units_sold",
+        ax, rev, "category_id", "units_sold",
         "Units Sold by Category (Top 10)",
         os.path.join(OUT_DIR, "02_units_sold_by_category_top10.png"),
         top_n=10
@@ -75,22 +98,19 @@ def main():
     # -------------------------
     # 2) Top Spenders
     # -------------------------
-    spend_dir = os.path.join(BASE_DIR, "top_spenders")
-    spend_csv = find_single_csv(spend_dir)
-    spend = pd.read_csv(spend_csv)
-
-    spend["total_spent"] = pd.to_numeric(spend["total_spent"], errors="coerce")
-    spend["num_orders"] = pd.to_numeric(spend["num_orders"], errors="coerce")
+    spend = read_output("top_spenders", {
+        "total_spent": pa.float64(), "num_orders": pa.int64(),
+    })
 
     save_bar(
-        spend, "user_id", "total_spent",
+        ax, spend, "user_id", "total_spent",
         "Top Spenders (Top 10 Users)",
         os.path.join(OUT_DIR, "03_top_spenders_top10.png"),
         top_n=10
     )
 
     save_bar(
-        spend, "user_id", "num_orders",
+        ax, spend, "user_id", "num_orders",
         "Most Orders (Top 10 Users)",
         os.path.join(OUT_DIR, "04_top_users_by_orders_top10.png"),
         top_n=10
@@ -99,21 +119,20 @@ def main():
     # -------------------------
     # 3) Also-bought pairs
     # -------------------------
-    also_dir = os.path.join(BASE_DIR, "also_bought_top50")
-    also_csv = find_single_csv(also_dir)
-    also = pd.read_csv(also_csv)
+    also = read_output("also_bought_top50", {"co_purchase_count": pa.int64()})
 
-    also["co_purchase_count"] = pd.to_numeric(also["co_purchase_count"], errors="coerce")
-    also["pair"] = also["product_x"].astype(str) + " + " + also["product_y"].astype(str)
+    also["pair"] = also["product_x"].astype("string").str.cat(also["product_y"].astype("string"), sep=" + ")
 
     save_bar(
-        also, "pair", "co_purchase_count",
+        ax, also, "pair", "co_purchase_count",
         "Frequently Bought Together (Top 10 Pairs)",
         os.path.join(OUT_DIR, "05_also_bought_pairs_top10.png"),
         top_n=10,
         rotate=60
     )
 
+    plt.close(fig)
+
     print("DONE: Plots saved in:", OUT_DIR)
     for f in sorted(glob.glob(os.path.join(OUT_DIR, "*.png"))):
         print(" -", f)